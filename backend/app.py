@@ -1,12 +1,17 @@
-import os, math, json, time, datetime
-from typing import Dict, Any
+import os, re, math, json, time, datetime, asyncio, functools, tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote_plus
+from typing import Dict, Any, Awaitable, Callable
 import pandas as pd
 import numpy as np
 import httpx
-from fastapi import FastAPI, HTTPException, Query
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+from fastapi import FastAPI, HTTPException, Query, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 import yfinance as yf
-import feedparser
+from lxml import etree
 import nltk
 from nltk.sentiment import SentimentIntensityAnalyzer
 
@@ -16,12 +21,32 @@ try:
 except LookupError:
     nltk.download('vader_lexicon')
 
+# Lexicon is read-only once loaded; share one analyzer across requests
+SIA = SentimentIntensityAnalyzer()
+
+@functools.lru_cache(maxsize=4096)
+def headline_compound(title: str) -> float:
+    # Headlines repeat across tickers and refreshes; score each distinct title once
+    return SIA.polarity_scores(title)["compound"]
+
+# Remote feeds are untrusted: no entity expansion or network lookups while parsing
+RSS_PARSER = etree.XMLParser(resolve_entities=False, no_network=True)
+
 # Use a polite SEC user agent (replace with your contact)
 SEC_HEADERS = {
     "User-Agent": "OpenResearchPWA/1.0 (contact: you@example.com)",
-    "Accept-Encoding": "gzip, deflate",
-    "Host": "www.sec.gov"
+    "Accept-Encoding": "gzip, deflate, br",
 }
+SEC_TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
+FILING_FORMS = frozenset(("10-K", "10-Q", "8-K"))
+
+# Ticker -> CIK, filled from SEC_TICKERS_URL in the background on startup and refreshed daily
+TICKER2CIK: Dict[str, int] = {}
+TICKER_MAP_RETRY_AFTER = 300  # seconds before re-downloading the map after a failed load
+_ticker_map_lock = asyncio.Lock()
+_ticker_map_loaded_at = 0.0
+_ticker_map_retry_at = 0.0
+_ticker_map_task: asyncio.Task | None = None
 
 app = FastAPI(title="Open Research Backend", version="1.0.0")
 
@@ -34,21 +59,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def startup():
+    # yfinance is synchronous and runs via asyncio.to_thread; size the pool for blocking I/O, not CPU count
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=40, thread_name_prefix="blocking-io"))
+    # One pooled client for the app lifetime: keep-alive + HTTP/2 reuse connections across requests
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=20,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=128),
+        headers={"Accept-Encoding": "gzip, deflate, br"},
+    )
+    # Don't hold up worker boot on SEC; fetch_filings waits for (or retries) the load on demand
+    refresh_ticker_map(app.state.http)
+
+@app.on_event("shutdown")
+async def shutdown():
+    if _ticker_map_task is not None:
+        _ticker_map_task.cancel()
+    await app.state.http.aclose()
+    if REDIS is not None:
+        await REDIS.aclose()
+
+def get_http(request: Request) -> httpx.AsyncClient:
+    return request.app.state.http
+
 def now_utc_iso():
     return datetime.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
 
 def restricted_link(url: str) -> Dict[str, str]:
     return {"restricted; visit link": url}
 
+# Non-JSON bodies are only kept as a preview; stop downloading once we have this many bytes
+MAX_CONTENT_BYTES = 50_000
+
 async def fetch_json(client: httpx.AsyncClient, url: str, headers: Dict[str, str] | None = None) -> Any:
     try:
-        r = await client.get(url, headers=headers, timeout=20)
-        if r.status_code != 200:
-            return restricted_link(url)
-        ct = r.headers.get("content-type","")
-        if "application/json" in ct or url.endswith(".json"):
-            return r.json()
-        return {"url": url, "content": r.text[:50000]}
+        async with client.stream("GET", url, headers=headers, timeout=20) as r:
+            if r.status_code != 200:
+                return restricted_link(url)
+            ct = r.headers.get("content-type","")
+            if "application/json" in ct or url.endswith(".json"):
+                return json.loads(await r.aread())
+            body = bytearray()
+            async for chunk in r.aiter_bytes():
+                body += chunk
+                if len(body) >= MAX_CONTENT_BYTES:
+                    break
+            return {"url": url, "content": body[:MAX_CONTENT_BYTES].decode(r.charset_encoding or "utf-8", errors="replace")}
     except Exception:
         return restricted_link(url)
 
@@ -57,7 +115,224 @@ def last_12m_dates():
     start = end - datetime.timedelta(days=365)
     return start.date().isoformat(), end.date().isoformat()
 
-async def module1_facts(ticker: str) -> Dict[str, Any]:
+# Cache TTLs aligned with how often each source actually changes
+TTL_NEWS = 60 * 60               # headlines: hourly
+TTL_INFO = 24 * 60 * 60          # profile/ratios, filings, ticker map: daily
+TTL_QUARTERLY = 90 * 24 * 60 * 60  # financials: quarterly
+
+class FileCache:
+    """TTL cache stored as JSON under {root}/{endpoint}/{key}.json, with a bounded in-memory layer in front."""
+
+    def __init__(self, root: str, mem_size: int = 512):
+        self.root = root
+        self.mem_size = mem_size
+        self._mem: OrderedDict[tuple[str, str], Dict[str, Any]] = OrderedDict()
+
+    def _path(self, endpoint: str, key: str) -> str:
+        return os.path.join(self.root, endpoint, re.sub(r"[^A-Za-z0-9._-]", "_", key) + ".json")
+
+    def _remember(self, k: tuple[str, str], entry: Dict[str, Any]) -> None:
+        self._mem[k] = entry
+        self._mem.move_to_end(k)
+        while len(self._mem) > self.mem_size:
+            self._mem.popitem(last=False)
+
+    def _read(self, endpoint: str, key: str) -> Dict[str, Any] | None:
+        try:
+            with open(self._path(endpoint, key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if isinstance(entry, dict) and {"fetched_at", "ttl", "payload"} <= entry.keys():
+            return entry
+        return None
+
+    def _write(self, endpoint: str, key: str, entry: Dict[str, Any]) -> None:
+        path = self._path(endpoint, key)
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Unique temp file per write: concurrent sets of one key (threads or workers) never share it
+            with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+                tmp = f.name
+                json.dump(entry, f, default=str)
+            os.replace(tmp, path)
+        except OSError:
+            # disk cache is best-effort; the in-memory copy still serves this worker
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+    async def get(self, endpoint: str, key: str) -> Any:
+        k = (endpoint, key)
+        entry = self._mem.get(k)
+        if entry is None:
+            # Disk I/O (a few hundred KB for the SEC ticker map) stays off the event loop
+            entry = await asyncio.to_thread(self._read, endpoint, key)
+            if entry is None:
+                return None
+        if time.time() >= entry["fetched_at"] + entry["ttl"]:
+            self._mem.pop(k, None)
+            return None
+        self._remember(k, entry)
+        return entry["payload"]
+
+    async def set(self, endpoint: str, key: str, payload: Any, ttl: int, fetched_at: float | None = None) -> Dict[str, Any]:
+        entry = {"fetched_at": time.time() if fetched_at is None else fetched_at, "ttl": ttl, "payload": payload}
+        self._remember((endpoint, key), entry)
+        await asyncio.to_thread(self._write, endpoint, key, entry)
+        return entry
+
+CACHE = FileCache(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+
+# Optional cache shared by all workers/hosts (e.g. REDIS_URL=redis://localhost:6379/0); FileCache stays the per-host layer
+REDIS_URL = os.environ.get("REDIS_URL")
+REDIS = aioredis.from_url(REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5) if REDIS_URL else None
+REDIS_RETRY_AFTER = 30  # seconds to skip Redis after an error, so an outage doesn't add a timeout to every lookup
+_redis_down_until = 0.0
+
+async def redis_call(fn: Callable[[], Awaitable[Any]]) -> Any:
+    global _redis_down_until
+    if REDIS is None or time.time() < _redis_down_until:
+        return None
+    try:
+        return await fn()
+    except (RedisError, OSError):
+        _redis_down_until = time.time() + REDIS_RETRY_AFTER
+        return None
+
+def is_cacheable(payload: Any) -> bool:
+    # Don't pin failures (empty results / restricted links) for a whole TTL
+    return bool(payload) and not (isinstance(payload, dict) and "restricted; visit link" in payload)
+
+async def cached(endpoint: str, key: str, ttl: int, fetch: Callable[[], Awaitable[Any]],
+                 valid: Callable[[Any], bool] = is_cacheable) -> Any:
+    hit = await CACHE.get(endpoint, key)
+    if hit is not None:
+        return hit
+    rkey = f"research:{endpoint}:{key}"
+    raw = await redis_call(lambda: REDIS.get(rkey))
+    if raw is not None:
+        # Redis holds the FileCache entry shape; keeping fetched_at means the local copy expires with the shared one
+        try:
+            entry = json.loads(raw)
+            await CACHE.set(endpoint, key, entry["payload"], entry["ttl"], fetched_at=entry["fetched_at"])
+            return entry["payload"]
+        except (ValueError, TypeError, KeyError):
+            pass
+    payload = await fetch()
+    if valid(payload):
+        entry = await CACHE.set(endpoint, key, payload, ttl)
+        await redis_call(lambda: REDIS.setex(rkey, ttl, json.dumps(entry, default=str)))
+    return payload
+
+# Fields module1_facts reads from yfinance's info dict
+COMPANY_INFO_KEYS = ("shortName", "longName", "sector", "industry", "exchange", "country")
+RATIO_KEYS = ("trailingPE", "forwardPE", "priceToBook", "returnOnEquity", "profitMargins", "debtToEquity", "operatingMargins")
+
+def has_company_info(info: Any) -> bool:
+    # Unknown tickers come back as a near-empty dict (e.g. {'trailingPegRatio': None}); don't cache those
+    return isinstance(info, dict) and any(info.get(k) is not None for k in COMPANY_INFO_KEYS + RATIO_KEYS)
+
+def yf_info(yf_tkr: yf.Ticker) -> Dict[str, Any]:
+    try:
+        return yf_tkr.info or {}
+    except Exception:
+        return {}
+
+def yf_quarterly(yf_tkr: yf.Ticker) -> Dict[str, Any]:
+    # Last 4 quarters (revenue/net income if available)
+    try:
+        q = yf_tkr.quarterly_financials
+        rows = {}
+        if isinstance(q, pd.DataFrame) and not q.empty:
+            # Rows are metrics, columns are quarter dates: read the two cells we need by label
+            has_rev = "Total Revenue" in q.index
+            has_ni = "Net Income" in q.index
+            for d in list(q.columns)[-4:]:
+                rows[str(d.date())] = {
+                    "Revenue": q.at["Total Revenue", d] if has_rev else None,
+                    "NetIncome": q.at["Net Income", d] if has_ni else None
+                }
+        return rows
+    except Exception:
+        return {}
+
+async def fetch_rss(client: httpx.AsyncClient, url: str) -> list[Dict[str, Any]]:
+    try:
+        r = await client.get(url, timeout=20, follow_redirects=True)
+        if r.status_code != 200:
+            return []
+        root = etree.fromstring(r.content, RSS_PARSER)
+    except Exception:
+        return []
+    headlines = []
+    for item in root.findall(".//item")[:30]:
+        headlines.append({
+            "title": item.findtext("title"),
+            "link": item.findtext("link"),
+            "published": item.findtext("pubDate")
+        })
+    return headlines
+
+async def fetch_ticker_map(client: httpx.AsyncClient) -> Dict[str, int]:
+    data = await fetch_json(client, SEC_TICKERS_URL, headers=SEC_HEADERS)
+    try:
+        return {v["ticker"].upper(): int(v["cik_str"]) for v in data.values()}
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return {}  # restricted link or malformed payload: not cached, triggers the back-off
+
+def ticker_map_due() -> bool:
+    return time.time() >= max(_ticker_map_loaded_at + TTL_INFO, _ticker_map_retry_at)
+
+async def load_ticker_map(client: httpx.AsyncClient) -> None:
+    global _ticker_map_loaded_at, _ticker_map_retry_at
+    # Concurrent callers share one download; after a failure, back off instead of re-fetching per request
+    async with _ticker_map_lock:
+        if not ticker_map_due():
+            return
+        data = await cached("sec_ticker_map", "company_tickers", TTL_INFO, lambda: fetch_ticker_map(client))
+        if isinstance(data, dict) and data:
+            TICKER2CIK.clear()
+            TICKER2CIK.update(data)
+            _ticker_map_loaded_at = time.time()
+        else:
+            _ticker_map_retry_at = time.time() + TICKER_MAP_RETRY_AFTER
+
+def refresh_ticker_map(client: httpx.AsyncClient) -> None:
+    global _ticker_map_task
+    if _ticker_map_task is None or _ticker_map_task.done():
+        _ticker_map_task = asyncio.create_task(load_ticker_map(client))
+
+async def fetch_filings(client: httpx.AsyncClient, ticker: str, since: str) -> Any:
+    if not TICKER2CIK:
+        await load_ticker_map(client)  # waits for the startup load, or retries it once the back-off expires
+    elif ticker_map_due():
+        refresh_ticker_map(client)  # keep serving the current map while the daily refresh runs
+    cik = TICKER2CIK.get(ticker)
+    if cik is None:
+        return restricted_link(f"https://www.sec.gov/edgar/search/#/q={ticker}&category=custom&forms=10-K,10-Q,8-K")
+    url = f"https://data.sec.gov/submissions/CIK{cik:010d}.json"
+    data = await fetch_json(client, url, headers=SEC_HEADERS)
+    recent = data.get("filings", {}).get("recent") if isinstance(data, dict) else None
+    if not isinstance(recent, dict):
+        return restricted_link(url)
+    # filings.recent is column-oriented: zip the parallel arrays instead of building a frame
+    filings = []
+    for form, date, acc, doc in zip(recent.get("form", []), recent.get("filingDate", []),
+                                    recent.get("accessionNumber", []), recent.get("primaryDocument", [])):
+        if form in FILING_FORMS and date >= since:
+            filings.append({
+                "form": form,
+                "filingDate": date,
+                "accessionNumber": acc,
+                "url": f"https://www.sec.gov/Archives/edgar/data/{cik}/{acc.replace('-', '')}/{doc}"
+            })
+    return {"cik": cik, "source": url, "filings": filings}
+
+async def module1_facts(ticker: str, client: httpx.AsyncClient) -> Dict[str, Any]:
     start_date, end_date = last_12m_dates()
     out: Dict[str, Any] = {
         "ticker": ticker.upper(),
@@ -65,97 +340,76 @@ async def module1_facts(ticker: str) -> Dict[str, Any]:
         "sources_used": []
     }
 
-    async with httpx.AsyncClient() as client:
-        # 1) Company profile & quotes (Yahoo Finance via yfinance)
-        yf_tkr = yf.Ticker(ticker)
-        info = {}
-        try:
-            info = yf_tkr.info or {}
-        except Exception:
-            info = {}
-        out["company_info"] = {
-            "shortName": info.get("shortName"),
-            "longName": info.get("longName"),
-            "sector": info.get("sector"),
-            "industry": info.get("industry"),
-            "exchange": info.get("exchange"),
-            "country": info.get("country"),
-        }
-        out["sources_used"].append(f"https://finance.yahoo.com/quote/{ticker.upper()}")
+    t = ticker.upper()
+    yf_tkr = yf.Ticker(ticker)
+    if t == "INTC":
+        edgar_fetch = functools.partial(fetch_json, client, "https://www.intc.com/filings-reports/all-sec-filings")
+    else:
+        edgar_fetch = functools.partial(fetch_filings, client, t, start_date)
+    query = f"{ticker} when:365d"
+    rss_url = f"https://news.google.com/rss/search?q={quote_plus(query)}&hl=en-US&gl=US&ceid=US:en"
 
-        # 2) Last 4 quarters (revenue/net income if available)
-        try:
-            q = yf_tkr.quarterly_financials
-            rows = {}
-            if isinstance(q, pd.DataFrame) and not q.empty:
-                qt = q.T
-                for d, row in qt.tail(4).iterrows():
-                    rows[str(d.date())] = {
-                        "Revenue": row.get("Total Revenue", None),
-                        "NetIncome": row.get("Net Income", None)
-                    }
-            out["last_4_quarters"] = rows
-        except Exception:
-            out["last_4_quarters"] = {}
-
-        # 3) Ratios snapshot
-        ratios = {}
-        keys = ["trailingPE","forwardPE","priceToBook","returnOnEquity","profitMargins","debtToEquity","operatingMargins"]
-        for k in keys:
-            v = info.get(k)
-            ratios[k] = float(v) if v is not None else None
-        out["financial_ratios"] = ratios
-
-        # 4) Filings link (EDGAR search page or company IR page)
-        if ticker.upper() == "INTC":
-            filings_url = "https://www.intc.com/filings-reports/all-sec-filings"
-            edgar = await fetch_json(client, filings_url)
-        else:
-            filings_url = f"https://www.sec.gov/edgar/search/#/q={ticker.upper()}&category=custom&forms=10-K,10-Q,8-K"
-            edgar = await fetch_json(client, filings_url, headers=SEC_HEADERS)
-        out["edgar_filings"] = edgar
-
-        # 5) News headlines (Google News RSS)
-        query = f"{ticker} when:365d"
-        rss_url = f"https://news.google.com/rss/search?q={httpx.utils.quote(query)}&hl=en-US&gl=US&ceid=US:en"
-        rss = feedparser.parse(rss_url)
-        headlines = []
-        for e in rss.entries[:30]:
-            headlines.append({
-                "title": e.title,
-                "link": e.link,
-                "published": getattr(e, "published", None)
-            })
-        out["news_headlines"] = headlines
-        out["sources_used"].append("https://news.google.com/rss/")
-
-        # 6) Light examples for corporate actions / leadership (for INTC demo)
-        if ticker.upper() == "INTC":
-            out.setdefault("corporate_actions", []).append({
-                "item": "Example: Noted major partnership and restructuring in last 12 months (see news/filings).",
-                "sources": [
-                    "https://www.intc.com/filings-reports/all-sec-filings",
-                    f"https://news.google.com/search?q={ticker}"
-                ]
-            })
-            out["leadership"] = {
-                "change": "Example: leadership changes referenced in public news.",
-                "sources": [f"https://news.google.com/search?q={ticker}+leadership"]
-            }
-            out["dividends"] = {
-                "status": "Check company IR or Yahoo 'Dividends' tab for current status.",
-                "sources": [f"https://finance.yahoo.com/quote/{ticker}/history?p={ticker}"]
-            }
+    # All sources are independent: run the blocking yfinance calls in threads and await everything at once
+    info, quarters, edgar, headlines = await asyncio.gather(
+        cached("company_info", t, TTL_INFO, lambda: asyncio.to_thread(yf_info, yf_tkr), valid=has_company_info),
+        cached("quarterly_financials", t, TTL_QUARTERLY, lambda: asyncio.to_thread(yf_quarterly, yf_tkr)),
+        cached("edgar_submissions", t, TTL_INFO, edgar_fetch),
+        cached("news_headlines", t, TTL_NEWS, lambda: fetch_rss(client, rss_url)),
+    )
+
+    # 1) Company profile & quotes (Yahoo Finance via yfinance)
+    out["company_info"] = {k: info.get(k) for k in COMPANY_INFO_KEYS}
+    out["sources_used"].append(f"https://finance.yahoo.com/quote/{ticker.upper()}")
+
+    # 2) Last 4 quarters (revenue/net income if available)
+    out["last_4_quarters"] = quarters
+
+    # 3) Ratios snapshot
+    ratios = {}
+    for k in RATIO_KEYS:
+        v = info.get(k)
+        ratios[k] = float(v) if v is not None else None
+    out["financial_ratios"] = ratios
+
+    # 4) Filings (EDGAR submissions API, or company IR page)
+    out["edgar_filings"] = edgar
+
+    # 5) News headlines (Google News RSS)
+    out["news_headlines"] = headlines
+    out["sources_used"].append("https://news.google.com/rss/")
+
+    # 6) Light examples for corporate actions / leadership (for INTC demo)
+    if ticker.upper() == "INTC":
+        out.setdefault("corporate_actions", []).append({
+            "item": "Example: Noted major partnership and restructuring in last 12 months (see news/filings).",
+            "sources": [
+                "https://www.intc.com/filings-reports/all-sec-filings",
+                f"https://news.google.com/search?q={ticker}"
+            ]
+        })
+        out["leadership"] = {
+            "change": "Example: leadership changes referenced in public news.",
+            "sources": [f"https://news.google.com/search?q={ticker}+leadership"]
+        }
+        out["dividends"] = {
+            "status": "Check company IR or Yahoo 'Dividends' tab for current status.",
+            "sources": [f"https://finance.yahoo.com/quote/{ticker}/history?p={ticker}"]
+        }
 
     return out
 
+# Module 2 subscore weights, in fixed order
+SCORE_KEYS = ("profitability", "growth", "balance_sheet", "cashflow_quality", "valuation", "industry_position", "regulatory_signals")
+WEIGHTS = (0.25, 0.2, 0.15, 0.1, 0.2, 0.05, 0.05)
+
 def module2_financial_score(m1: Dict[str,Any]) -> tuple[int, Dict[str, Any]]:
     ratios = m1.get("financial_ratios", {})
     subscores = {}
 
     # Profitability/margins
     pm = [x for x in (ratios.get("profitMargins"), ratios.get("operatingMargins"), ratios.get("returnOnEquity")) if x is not None]
-    subscores["profitability"] = max(0, min(100, int(50 + 20*len(pm) + 100*(np.nanmean(pm) if pm else -0.2))))
+    pm_mean = sum(pm)/len(pm) if pm else -0.2
+    subscores["profitability"] = max(0, min(100, int(50 + 20*len(pm) + 100*pm_mean)))
 
     # Growth: simple revenue trend if available
     l4q = m1.get("last_4_quarters", {})
@@ -189,49 +443,60 @@ def module2_financial_score(m1: Dict[str,Any]) -> tuple[int, Dict[str, Any]]:
     subscores["industry_position"] = 50
     subscores["regulatory_signals"] = 50
 
-    weights = {
-        "profitability": 0.25,
-        "growth": 0.2,
-        "balance_sheet": 0.15,
-        "cashflow_quality": 0.1,
-        "valuation": 0.2,
-        "industry_position": 0.05,
-        "regulatory_signals": 0.05
-    }
-    score = int(sum(subscores[k]*w for k,w in weights.items()))
+    # Same left-to-right summation as before: a reordered sum can land just under an integer and truncate differently
+    score = int(sum(subscores[k]*w for k, w in zip(SCORE_KEYS, WEIGHTS)))
     return score, subscores
 
+# Matched as whole words, so inflections are listed explicitly; multi-word entries are substring phrases
+KW_POS = ["subsidy","subsidies","subsidized","grant","grants","granted",
+          "government stake","partnership","partnerships","investment","investments",
+          "CHIPS","incentive","incentives"]
+KW_NEG = ["tariff","tariffs","sanction","sanctions","sanctioned","ban","bans","banned","banning",
+          "strike","strikes","striking","flood","floods","flooded","flooding",
+          "earthquake","earthquakes","war","wars","export control",
+          "geopolitics","conflict","conflicts","typhoon","typhoons","hurricane","hurricanes"]
+TOKEN_RE = re.compile(r"[a-z]+")
+
+def keyword_sets(keywords: list[str]) -> tuple[frozenset[str], tuple[str, ...]]:
+    words = frozenset(k.lower() for k in keywords if " " not in k)
+    return words, tuple(k.lower() for k in keywords if " " in k)
+
+KW_POS_WORDS, KW_POS_PHRASES = keyword_sets(KW_POS)
+KW_NEG_WORDS, KW_NEG_PHRASES = keyword_sets(KW_NEG)
+
 def module3_exogenous_score(m1: Dict[str,Any]) -> tuple[int, Dict[str, Any]]:
-    kw_pos = ["subsidy","grant","government stake","partnership","investment","CHIPS","incentive"]
-    kw_neg = ["tariff","sanction","ban","strike","flood","earthquake","war","export control","geopolitics","conflict","typhoon","hurricane"]
     news = m1.get("news_headlines", [])
-    pos = sum(any(k.lower() in (n.get("title") or "").lower() for k in kw_pos) for n in news)
-    neg = sum(any(k.lower() in (n.get("title") or "").lower() for k in kw_neg) for n in news)
+    pos = neg = 0
+    for n in news:
+        title = (n.get("title") or "").lower()
+        toks = set(TOKEN_RE.findall(title))
+        pos += bool(toks & KW_POS_WORDS) or any(p in title for p in KW_POS_PHRASES)
+        neg += bool(toks & KW_NEG_WORDS) or any(p in title for p in KW_NEG_PHRASES)
     raw = min(10, max(-20, pos - 2*neg))  # −20 … +10
     rescaled = int((raw + 20) * (100/30))  # → 0 … 100
     return rescaled, {"raw": raw, "pos_hits": pos, "neg_hits": neg}
 
 def module4_behavioral_score(m1: Dict[str,Any]) -> tuple[int, Dict[str, Any]]:
-    sia = SentimentIntensityAnalyzer()
     news = m1.get("news_headlines", [])
     if not news:
         return 50, {"sentiment": 0.0}
-    scores = [sia.polarity_scores(n["title"])["compound"] for n in news if n.get("title")]
-    if not scores:
+    titles = [n["title"] for n in news if n.get("title")]
+    if not titles:
         return 50, {"sentiment": 0.0}
-    avg = float(np.mean(scores))
+    scores = np.fromiter((headline_compound(t) for t in titles), dtype=np.float64, count=len(titles))
+    avg = float(scores.mean())
     sent = int((avg + 1) * 50)  # −1..+1 → 0..100
     score = int(0.7*sent + 0.3*55)  # blend with a discipline baseline
     return score, {"avg_compound": avg, "headline_count": len(scores)}
 
 @app.get("/api/research")
-async def research(ticker: str = Query(..., min_length=1, max_length=10)):
+async def research(ticker: str = Query(..., min_length=1, max_length=10), client: httpx.AsyncClient = Depends(get_http)):
     """
     Returns facts + scores + verdict for a ticker using only free/public sources.
     If any source is restricted/paywalled, returns: {"restricted; visit link": "<URL>"} for that item.
     """
     t = ticker.upper().strip()
-    m1 = await module1_facts(t)
+    m1 = await module1_facts(t, client)
     fin_score, fin_detail = module2_financial_score(m1)
     exo_score, exo_detail = module3_exogenous_score(m1)
     beh_score, beh_detail = module4_behavioral_score(m1)